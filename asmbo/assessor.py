@@ -9,12 +9,13 @@
 import math, numpy as np
 from asmbo.paths import MMS_PATH
 import sys; sys.path += [MMS_PATH]
-from asmbo.helper.analyse import get_stress, get_geodesics
+from asmbo.helper.analyse import get_stress, get_geodesics, get_eval_quats
+from asmbo.helper.orientation import get_euler_fields, get_geodesic_array
 from asmbo.helper.surrogate import Model
-from asmbo.helper.io import csv_to_dict, dict_to_csv
+from asmbo.helper.io import csv_to_dict, dict_to_csv, load_cols
 
 def assess(params_list:list, sm_path:str, exp_path:str, max_strain:float, grain_ids:list,
-           param_names:list) -> dict:
+           param_names:list, output_path:str=None) -> dict:
     """
     Assesses the surrogate model using previously optimised simulation results
 
@@ -26,6 +27,7 @@ def assess(params_list:list, sm_path:str, exp_path:str, max_strain:float, grain_
     * `grain_ids`:   List of grain IDs to conduct the training
     * `sim_keyword`: Keyword to identify directories containing simulation results
     * `param_names`: List of parameter names
+    * `output_path`: Path to save the errors; defaults to the surrogate model path
 
     Returns a dictionary of the best parameters
     """
@@ -35,25 +37,30 @@ def assess(params_list:list, sm_path:str, exp_path:str, max_strain:float, grain_
         return None
 
     # Initialise other information
-    exp_dict = csv_to_dict(exp_path)
+    exp_fields = ["strain", "stress", "strain_intervals"] + list(get_euler_fields(tuple(grain_ids)))
+    exp_dict = load_cols(exp_path, exp_fields, cache=True)
     eval_strains = list(np.linspace(0, max_strain, 50))
     fields = ["iteration"] + param_names + ["stress_error", "geodesic_error", "reduced_error"]
     error_dict = dict(zip(fields, [[] for _ in range(len(fields))]))
 
-    # Calculate the errors for each set of parameters
-    for params_dict in params_list:
-
-        # Define model
-        model = Model(
-            sm_path    = f"{sm_path}/sm.pt",
-            map_path   = f"{sm_path}/map.csv",
-            exp_path   = exp_path,
-            max_strain = max_strain,
-        )
+    # Get the experimental orientations once, as quaternions
+    if grain_ids != []:
+        exp_quats = get_eval_quats(grain_ids, exp_dict, exp_dict["strain_intervals"], eval_strains)
 
-        # Evaluate the model's performance
-        param_values = [params_dict[param_name] for param_name in param_names]
-        res_dict = model.get_response(param_values)
+    # Define model
+    model = Model(
+        sm_path    = f"{sm_path}/sm.pt",
+        map_path   = f"{sm_path}/map.csv",
+        exp_path   = exp_path,
+        max_strain = max_strain,
+    )
+
+    # Evaluate the model's performance on all sets of parameters at once
+    param_grid = [[params_dict[param_name] for param_name in param_names] for params_dict in params_list]
+    res_dict_list = model.get_responses(param_grid)
+
+    # Calculate the errors for each set of parameters
+    for params_dict, res_dict in zip(params_list, res_dict_list):
 
         # Calculate stress error
         stress_error = get_stress(
@@ -66,15 +73,9 @@ def assess(params_list:list, sm_path:str, exp_path:str, max_strain:float, grain_
 
         # Calculate orientation error
         if grain_ids != []:
-            geodesic_grid = get_geodesics(
-                grain_ids     = grain_ids,
-                data_dict_1   = exp_dict,
-                data_dict_2   = res_dict,
-                strain_list_1 = exp_dict["strain_intervals"],
-                strain_list_2 = res_dict["strain"],
-                eval_strains  = eval_strains
-            )
-            geodesic_error = np.average([np.sqrt(np.average([g**2 for g in gg])) for gg in geodesic_grid])
+            res_quats = get_eval_quats(grain_ids, res_dict, res_dict["strain"], eval_strains)
+            geodesic_grid = get_geodesic_array(exp_quats, res_quats)
+            geodesic_error = np.average(np.sqrt(np.average(np.square(geodesic_grid), axis=1)))
         else:
             geodesic_error = 0
 
@@ -87,7 +88,8 @@ def assess(params_list:list, sm_path:str, exp_path:str, max_strain:float, grain_
         error_dict["reduced_error"].append(stress_error+geodesic_error/math.pi)
         
     # Save error information
-    dict_to_csv(error_dict, f"{sm_path}/errors.csv")
+    output_path = sm_path if output_path == None else output_path
+    dict_to_csv(error_dict, f"{output_path}/errors.csv")
 
     # Return best parameters
     min_index = error_dict["reduced_error"].index(min(error_dict["reduced_error"]))
@@ -119,7 +121,8 @@ def calculate_errors(sim_path:str, exp_path:str, grain_ids:list, max_strain:floa
     # Calculate errors
     stress_error = get_stress(exp_dict["stress"], sim_dict[strain_field], exp_dict["strain"], sim_dict[stress_field], eval_strain_list)
     geodesic_grid = get_geodesics(grain_ids, exp_dict, sim_dict, exp_dict["strain_intervals"], sim_dict["average_strain"], eval_strain_list)
-    geodesic_error = np.average([np.sqrt(np.average([g**2 for g in gg])) for gg in geodesic_grid])
+    geodesic_grid = np.reshape(geodesic_grid, (len(grain_ids), len(eval_strain_list)))
+    geodesic_error = np.mean(np.sqrt(np.mean(np.square(geodesic_grid), axis=1)))
 
     # Return
     return stress_error, geodesic_error
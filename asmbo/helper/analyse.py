@@ -8,9 +8,8 @@
 # Libraries
 import math, numpy as np
 import matplotlib.pyplot as plt
-from asmbo.helper.general import transpose
 from asmbo.helper.interpolator import intervaluate
-from asmbo.helper.orientation import euler_to_quat, get_geodesic
+from asmbo.helper.orientation import EULER_FIELDS, euler_to_quat_array, get_euler_fields, get_geodesic_array
 
 def get_stress(stress_list_1:list, stress_list_2:list, strain_list_1:list,
                strain_list_2:list, eval_strains:list) -> list:
@@ -28,11 +27,13 @@ def get_stress(stress_list_1:list, stress_list_2:list, strain_list_1:list,
     Returns the normalised root mean square error for the stresses
     """
     max_strain = max(eval_strains)
-    stress_list = [stress for stress, strain in zip(stress_list_1, strain_list_1) if strain <= max_strain]
+    num_points = min(len(stress_list_1), len(strain_list_1))
+    stress_array = np.asarray(stress_list_1[:num_points], dtype=float)
+    stress_array = stress_array[np.asarray(strain_list_1[:num_points], dtype=float) <= max_strain]
     eval_stress_list_1 = intervaluate(strain_list_1, stress_list_1, eval_strains)
     eval_stress_list_2 = intervaluate(strain_list_2, stress_list_2, eval_strains)
-    mse = np.average([math.pow(es_1-es_2, 2) for es_1, es_2 in zip(eval_stress_list_1, eval_stress_list_2)])
-    nrmse = math.sqrt(mse)/np.average(stress_list)
+    mse = np.average(np.square(np.asarray(eval_stress_list_1) - np.asarray(eval_stress_list_2)))
+    nrmse = math.sqrt(mse)/np.average(stress_array)
     return nrmse
 
 def get_geodesics(grain_ids:list, data_dict_1:dict, data_dict_2:dict,
@@ -50,33 +51,34 @@ def get_geodesics(grain_ids:list, data_dict_1:dict, data_dict_2:dict,
     
     Returns list of lists of geodesic distances
     """
-
-    # Initialise
-    geodesic_grid = []
-
-    # Iterate through grain IDs
-    for grain_id in grain_ids:
-
-        # Get list of euler angles at specific strains
-        quick_ie = lambda data_dict, strain_list : intervaluate_eulers(*[data_dict[f"g{grain_id}_{phi}"]
-                   for phi in ["phi_1", "Phi", "phi_2"]], strain_list, eval_strains)
-        euler_list_1 = quick_ie(data_dict_1, strain_list_1)
-        euler_list_2 = quick_ie(data_dict_2, strain_list_2)
-        
-        # Calculate geodesic distances of orientations at the same strains
-        geodesic_list = []
-        for euler_1, euler_2 in zip(euler_list_1, euler_list_2):
-            quat_1 = euler_to_quat(euler_1)
-            quat_2 = euler_to_quat(euler_2)
-            geodesic = get_geodesic(quat_1, quat_2)
-            geodesic_list.append(geodesic)
-        geodesic_grid.append(geodesic_list)
+    quat_array_1 = get_eval_quats(grain_ids, data_dict_1, strain_list_1, eval_strains)
+    quat_array_2 = get_eval_quats(grain_ids, data_dict_2, strain_list_2, eval_strains)
+    geodesic_grid = get_geodesic_array(quat_array_1, quat_array_2).tolist()
 
     # Return list of lists of geodesic distances
     return geodesic_grid
 
+def get_eval_quats(grain_ids:list, data_dict:dict, strain_list:list, eval_strains:list) -> np.ndarray:
+    """
+    Gets the orientations of grains at certain strains as quaternions
+
+    Parameters:
+    * `grain_ids`:    List of grain IDs
+    * `data_dict`:    Dictionary containing the euler-bunge angles (rads)
+    * `strain_list`:  List of strain values to interpolate
+    * `eval_strains`: List of strain values to evaluate
+
+    Returns the quaternions as an array with shape (grains, strains, 4)
+    """
+    euler_fields = get_euler_fields(tuple(grain_ids))
+    num_fields = len(EULER_FIELDS)
+    euler_grid = [intervaluate_eulers(*[data_dict[field] for field in euler_fields[i:i+num_fields]],
+                  strain_list, eval_strains) for i in range(0, len(euler_fields), num_fields)]
+    euler_array = np.reshape(euler_grid, (len(grain_ids), len(eval_strains), 3))
+    return euler_to_quat_array(euler_array)
+
 def intervaluate_eulers(phi_1_list:list, Phi_list:list, phi_2_list:list,
-                       strain_list:list, eval_strains:list) -> list:
+                       strain_list:list, eval_strains:list) -> np.ndarray:
     """
     Interpolates the euler-bunge (rads) components and evaluates
     the components and certain strain values
@@ -88,13 +90,14 @@ def intervaluate_eulers(phi_1_list:list, Phi_list:list, phi_2_list:list,
     * `strain_list`:  List of strain values to interpolate
     * `eval_strains`: List of strain values to evaluate
     
-    Returns the evaluated orientations as a list of euler-bunge values (in lists)
+    Returns the evaluated orientations as an array of euler-bunge values
+    with shape (strains, 3)
     """
     phi_1_list = intervaluate(strain_list, phi_1_list, eval_strains)
     Phi_list = intervaluate(strain_list, Phi_list, eval_strains)
     phi_2_list = intervaluate(strain_list, phi_2_list, eval_strains)
-    euler_list = transpose([phi_1_list, Phi_list, phi_2_list])
-    return euler_list
+    euler_array = np.column_stack([np.asarray(phi_list, dtype=float) for phi_list in [phi_1_list, Phi_list, phi_2_list]])
+    return euler_array
 
 def plot_boxplots(y_list_list:list, colours:list) -> None:
     """
@@ -17,10 +17,7 @@ def safe_mkdir(dir_path:str) -> None:
     Parameters:
     * `dir_path`: The path to the directory
     """
-    try:
-        os.mkdir(dir_path)
-    except FileExistsError:
-        pass
+    os.makedirs(dir_path, exist_ok=True)
 
 def remove_consecutive_duplicates(value_list:list) -> list:
     """
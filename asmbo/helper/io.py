@@ -7,8 +7,9 @@
 
 # Libraries
 import math, os
-import pandas as pd
-from asmbo.helper.general import round_sf
+import numpy as np, pandas as pd
+from functools import lru_cache
+from asmbo.helper.general import round_sf, try_float
 
 def get_file_path_writable(file_path:str, extension:str):
     """
@@ -56,30 +57,19 @@ def csv_to_dict(csv_path:str, delimeter:str=",") -> dict:
     Returns the dictionary
     """
 
-    # Read all data from CSV (assume that file is not too big)
-    csv_fh = open(csv_path, "r", encoding="utf-8-sig")
-    csv_lines = csv_fh.readlines()
-    csv_fh.close()
+    # Read all data from CSV; only empty values are treated as missing
+    data_frame = pd.read_csv(csv_path, sep=delimeter, encoding="utf-8-sig", keep_default_na=False, na_values=[""])
+    headers = list(data_frame.columns)
 
-    # Initialisation for conversion
+    # Convert to dict, skipping empty values; numeric columns are converted
+    # in bulk and the values of other columns are converted individually
     csv_dict = {}
-    headers = csv_lines[0].replace("\n", "").split(delimeter)
-    csv_lines = csv_lines[1:]
     for header in headers:
-        csv_dict[header] = []
-
-    # Start conversion to dict
-    for csv_line in csv_lines:
-        csv_line_list = csv_line.replace("\n", "").split(delimeter)
-        for i in range(len(headers)):
-            value = csv_line_list[i]
-            if value == "":
-                continue
-            try:
-                value = float(value)
-            except:
-                pass
-            csv_dict[headers[i]].append(value)
+        column = data_frame[header].dropna()
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            csv_dict[header] = column.astype(float).tolist()
+        else:
+            csv_dict[header] = [try_float(str(value)) for value in column]
     
     # Convert single item lists to items and things multi-item lists
     for header in headers:
@@ -89,6 +79,94 @@ def csv_to_dict(csv_path:str, delimeter:str=",") -> dict:
     # Return
     return csv_dict
 
+@lru_cache(maxsize=8)
+def read_csv_cached(csv_path:str, modified_time:float) -> pd.DataFrame:
+    """
+    Reads a whole CSV file into a data frame and caches it;
+    the modified time is part of the key so that changed files are re-read
+
+    Parameters:
+    * `csv_path`:      The path to the CSV file
+    * `modified_time`: The time that the CSV file was last modified
+
+    Returns the data frame
+    """
+    return pd.read_csv(csv_path, encoding="utf-8-sig")
+
+def read_csv_frame(csv_path:str, columns:list, cache:bool=False) -> pd.DataFrame:
+    """
+    Reads a subset of columns from a CSV file into a data frame
+
+    Parameters:
+    * `csv_path`: The path to the CSV file
+    * `columns`:  List of column names to read
+    * `cache`:    Whether to read the file once and reuse it for later
+                  calls; intended for files that are read repeatedly
+
+    Returns the data frame
+    """
+    if cache:
+        return read_csv_cached(csv_path, os.path.getmtime(csv_path))[columns]
+    return pd.read_csv(csv_path, usecols=columns, encoding="utf-8-sig")
+
+def load_cols(csv_path:str, columns:list, cache:bool=False) -> dict:
+    """
+    Reads a subset of columns from a CSV file into a dictionary;
+    only the requested columns are parsed
+
+    Parameters:
+    * `csv_path`: The path to the CSV file
+    * `columns`:  List of column names to read
+    * `cache`:    Whether to reuse the cached contents of the file
+
+    Returns the dictionary of column lists
+    """
+    data_frame = read_csv_frame(csv_path, list(set(columns)), cache)
+    return {column: data_frame[column].dropna().tolist() for column in columns}
+
+def read_first_row(csv_path:str, columns:list) -> list:
+    """
+    Reads the first row of a subset of columns from a CSV file;
+    the remaining rows are not parsed
+
+    Parameters:
+    * `csv_path`: The path to the CSV file
+    * `columns`:  List of column names to read
+
+    Returns the list of values, ordered by the column names
+    """
+    data_frame = pd.read_csv(csv_path, usecols=columns, nrows=1, encoding="utf-8-sig")
+    return data_frame[columns].iloc[0].tolist()
+
+def read_last_row(csv_path:str, columns:list, cache:bool=False) -> list:
+    """
+    Reads the last complete row of a subset of columns from a CSV file;
+    rows with empty values in any of the columns are ignored
+
+    Parameters:
+    * `csv_path`: The path to the CSV file
+    * `columns`:  List of column names to read
+    * `cache`:    Whether to reuse the cached contents of the file
+
+    Returns the list of values, ordered by the column names
+    """
+    data_frame = read_csv_frame(csv_path, columns, cache)
+    return data_frame[columns].dropna().iloc[-1].tolist()
+
+def read_params(params_path:str) -> dict:
+    """
+    Reads parameters from a file
+
+    Parameters:
+    * `params_path`: The path to the parameters
+
+    Returns a dictionary containing the parameter information
+    """
+    with open(params_path, 'r') as file:
+        line_list = file.read().splitlines()
+    data_dict = {key: float(value) for key, value in (line.split(": ", 1) for line in line_list if line)}
+    return data_dict
+
 def dict_to_csv(data_dict:dict, csv_path:str, add_header:bool=True) -> None:
     """
     Converts a dictionary to a CSV file
@@ -102,7 +180,7 @@ def dict_to_csv(data_dict:dict, csv_path:str, add_header:bool=True) -> None:
     # Extract headers and turn all values into lists
     headers = data_dict.keys()
     for header in headers:
-        if not isinstance(data_dict[header], list):
+        if not isinstance(data_dict[header], (list, np.ndarray)):
             data_dict[header] = [data_dict[header]]
     
     # Open CSV file and write headers
@@ -142,7 +220,4 @@ def safe_mkdir(dir_path:str) -> None:
     Parameters:
     * `dir_path`: The path to the directory
     """
-    try:
-        os.mkdir(dir_path)
-    except FileExistsError:
-        pass
+    os.makedirs(dir_path, exist_ok=True)
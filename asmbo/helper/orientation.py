@@ -9,8 +9,12 @@
 
 # Libraries
 import numpy as np, math, random
+from functools import lru_cache
 from scipy.spatial.transform import Rotation
 
+# Constants
+EULER_FIELDS = ("phi_1", "Phi", "phi_2")
+
 def get_matrix_product(matrix_1:list, matrix_2:list) -> list:
     """
     Performs a 3x3 matrix multiplication
@@ -218,3 +222,75 @@ def get_geodesic(quat_1:list, quat_2:list) -> float:
     dot_product = np.clip(dot_product, -1.0, 1.0)
     distance = 2*np.arccos(np.abs(dot_product))
     return distance
+
+def euler_to_quat_array(euler_array:np.ndarray) -> np.ndarray:
+    """
+    Converts an array of euler-bunge angles (rads) into quaternions;
+    all the orientations are converted in a single call
+
+    Parameters:
+    * `euler_array`: The euler angles, with shape (..., 3)
+
+    Returns the unit quaternions as an array with shape (..., 4)
+    """
+    euler_array = np.asarray(euler_array, dtype=float)
+    rotation = Rotation.from_euler("zxz", euler_array.reshape(-1, 3), degrees=False)
+    quat_array = rotation.as_quat().reshape(euler_array.shape[:-1] + (4,))
+    return quat_array
+
+def get_geodesic_array(quat_array_1:np.ndarray, quat_array_2:np.ndarray) -> np.ndarray:
+    """
+    Gets the geodesic distances between pairs of unit quaternions;
+    uses the closed form of 2*acos(|q1.q2|) for every pair
+
+    Parameters:
+    * `quat_array_1`: The first array of quaternions, with shape (..., 4)
+    * `quat_array_2`: The second array of quaternions, with shape (..., 4)
+
+    Returns the geodesic distances as an array with shape (...)
+    """
+    dot_products = np.einsum("...i,...i->...", quat_array_1, quat_array_2)
+    distances = 2*np.arccos(np.clip(np.abs(dot_products), 0.0, 1.0))
+    return distances
+
+@lru_cache(maxsize=None)
+def get_euler_fields(grain_ids:tuple) -> tuple:
+    """
+    Gets the names of the euler-bunge fields for a set of grains;
+    cached so that the names are only formatted once
+
+    Parameters:
+    * `grain_ids`: Tuple of grain IDs
+
+    Returns the tuple of field names
+    """
+    return tuple(f"g{grain_id}_{phi}" for grain_id in grain_ids for phi in EULER_FIELDS)
+
+def get_trajectories(data_dict:dict, grain_ids:list, strain_field:str=None,
+                     max_strain:float=None) -> np.ndarray:
+    """
+    Stacks the reorientation trajectories of a list of grains
+
+    Parameters:
+    * `data_dict`:    Dictionary containing the euler-bunge angles (rads)
+    * `grain_ids`:    List of grain IDs
+    * `strain_field`: Name of the field for the strain data
+    * `max_strain`:   Maximum strain to include; if undefined, includes
+                      the whole trajectory
+
+    Returns the trajectories as an array of shape (grains, points, 3)
+    """
+
+    # Stack the euler-bunge angles of each grain
+    if grain_ids == []:
+        return np.empty((0, 0, 3))
+    euler_fields = get_euler_fields(tuple(grain_ids))
+    trajectories = np.stack([np.asarray(data_dict[field], dtype=float) for field in euler_fields], axis=1)
+    trajectories = trajectories.reshape(-1, len(grain_ids), len(EULER_FIELDS)).transpose(1, 0, 2)
+
+    # Remove the orientations beyond the maximum strain
+    if max_strain != None:
+        strain_array = np.asarray(data_dict[strain_field], dtype=float)
+        num_points = min(trajectories.shape[1], len(strain_array))
+        trajectories = trajectories[:, :num_points][:, strain_array[:num_points] <= max_strain]
+    return trajectories
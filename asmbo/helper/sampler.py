@@ -7,7 +7,10 @@
 """
 
 # Libraries
+import numpy as np
 import pyDOE2 # type: ignore
+from scipy.spatial.distance import pdist
+from scipy.stats import qmc
 
 def linear_scale(value:float, in_l_bound:float, in_u_bound:float, out_l_bound:float, out_u_bound:float) -> float:
     """
@@ -25,37 +28,45 @@ def linear_scale(value:float, in_l_bound:float, in_u_bound:float, out_l_bound:fl
     scaled_value = (value-in_l_bound)*out_range/in_range + out_l_bound
     return scaled_value
 
-def get_lhs(param_bounds:dict, num_points:int) -> list:
+def get_lhs(param_bounds:dict, num_points:int, seed:int=None, criterion:str="maximin",
+            num_candidates:int=100) -> list:
     """
     Generates points using latin hypercube sampling
     
     Parameters:
-    * `param_bounds`: Dictionary of parameter bounds;
-                      (i.e., `{"name": (l_bound, u_bound)}`)
-    * `num_points`:   The number of points to sample
+    * `param_bounds`:   Dictionary of parameter bounds;
+                        (i.e., `{"name": (l_bound, u_bound)}`)
+    * `num_points`:     The number of points to sample
+    * `seed`:           The seed for the random number generator
+    * `criterion`:      The criterion for optimising the points; "maximin"
+                        keeps the candidate design with the largest minimum
+                        distance between points, and "cd" reduces the
+                        centered discrepancy of a single design
+    * `num_candidates`: The number of candidate designs for "maximin"
     
     Returns the list of dictionaries of parameter combinations
     """
     
     # Get unscaled LHS points
-    num_params = len(param_bounds.keys())
-    combinations = list(pyDOE2.lhs(num_params, samples=num_points))
+    params = list(param_bounds.keys())
+    if criterion == "maximin":
+        sampler = qmc.LatinHypercube(d=len(params), seed=seed)
+        candidates = [sampler.random(n=num_points) for _ in range(num_candidates)]
+        min_distances = [pdist(candidate).min() if num_points > 1 else 0 for candidate in candidates]
+        combinations = candidates[np.argmax(min_distances)]
+    elif criterion == "cd":
+        sampler = qmc.LatinHypercube(d=len(params), optimization="random-cd", seed=seed)
+        combinations = sampler.random(n=num_points)
+    else:
+        raise ValueError(f"LHS criterion '{criterion}' unsupported!")
     
-    # Create linear scales for each parameter
-    param_scales = {}
-    for param in param_bounds.keys():
-        param_scales[param] = lambda x : linear_scale(x, 0, 1, param_bounds[param][0], param_bounds[param][1])
-
-    # Linearly scale the unscaled combinations
-    scaled_dict_list = []
-    for combination in combinations:
-        scaled_dict = {}
-        for i, param in enumerate(param_scales.keys()):
-            scaled_param = param_scales[param](combination[i])
-            scaled_dict[param] = scaled_param
-        scaled_dict_list.append(scaled_dict)
+    # Linearly scale the unscaled combinations; fixed parameters have equal bounds
+    l_bounds = np.array([param_bounds[param][0] for param in params])
+    u_bounds = np.array([param_bounds[param][1] for param in params])
+    combinations = l_bounds + combinations*(u_bounds-l_bounds)
 
     # Return scaled LHS points
+    scaled_dict_list = [dict(zip(params, combination)) for combination in combinations.tolist()]
     return scaled_dict_list
 
 def get_ccd(param_bounds:dict, centre_points:int=4, alpha:str="r") -> list:
@@ -9,7 +9,7 @@
 import torch, math, numpy as np
 import warnings
 from copy import deepcopy
-from asmbo.helper.io import csv_to_dict
+from asmbo.helper.io import csv_to_dict, load_cols
 
 def linear(value:float, map:dict, mapper, index:int) -> float:
     """
@@ -111,13 +111,14 @@ class Model:
         self.model, self.input_map, self.output_map = get_sm_info(sm_path, map_path)
         
         # Extract experimental information
-        exp_dict = csv_to_dict(exp_path)
+        is_orientation = lambda param_name : "phi_1" in param_name or "Phi" in param_name or "phi_2" in param_name
+        exp_fields = [param_name for param_name in self.output_map["param_name"] if is_orientation(param_name)]
+        exp_dict = load_cols(exp_path, exp_fields, cache=True)
         self.response_dict = {"strain": np.linspace(0, max_strain, 101)}
         # self.response_dict = {"strain": exp_dict["strain_intervals"]}
         self.response_dict["strain_intervals"] = self.response_dict["strain"]
         for param_name in self.output_map["param_name"]:
-            is_orientation = "phi_1" in param_name or "Phi" in param_name or "phi_2" in param_name
-            initial_value = exp_dict[param_name][0] if is_orientation else 0.0
+            initial_value = exp_dict[param_name][0] if is_orientation(param_name) else 0.0
             self.response_dict[param_name] = [initial_value]
 
     def get_response(self, param_list:list) -> dict:
@@ -129,22 +130,39 @@ class Model:
         
         Returns the response as a dictionary
         """
+        return self.get_responses([param_list])[0]
 
-        # Initialise
-        response_dict = deepcopy(self.response_dict)
+    def get_responses(self, param_grid:list) -> list:
+        """
+        Gets the responses of the model from multiple sets of parameters;
+        all the sets are evaluated in a single forward pass
 
-        # Get outputs and combine
-        for strain in response_dict["strain"][1:]:
-            output_dict = self.get_output(param_list + [strain])
-            if output_dict == None:
-                return
-            for key in output_dict.keys():
-                response_dict[key].append(output_dict[key])
-        
-        # Adjust and return
-        if "average_stress" in response_dict.keys():
-            response_dict["stress"] = response_dict.pop("average_stress")
-        return response_dict
+        Parameters:
+        * `param_grid`: List of lists of parameters
+
+        Returns the list of responses as dictionaries; the responses of
+        invalid sets of parameters are None
+        """
+
+        # Get outputs for all parameters and strains in a single pass
+        strain_list = list(self.response_dict["strain"][1:])
+        input_grid = [list(param_list) + [strain] for param_list in param_grid for strain in strain_list]
+        output_array = self.get_output_array(input_grid)
+        output_array = output_array.reshape(len(param_grid), len(strain_list), -1)
+
+        # Combine the outputs of each set of parameters
+        response_list = []
+        for param_output_array in output_array:
+            if not np.all(np.isfinite(param_output_array)):
+                response_list.append(None)
+                continue
+            response_dict = deepcopy(self.response_dict)
+            for i, key in enumerate(self.output_map["param_name"]):
+                response_dict[key] += param_output_array[:,i].tolist()
+            if "average_stress" in response_dict.keys():
+                response_dict["stress"] = response_dict.pop("average_stress")
+            response_list.append(response_dict)
+        return response_list
 
     def get_output(self, input_list:list) -> dict:
         """
@@ -155,28 +173,42 @@ class Model:
 
         Returns the outputs
         """
-        
+        output_array = self.get_output_array([input_list])
+        if not np.all(np.isfinite(output_array)):
+            return None
+        output_dict = dict(zip(self.output_map["param_name"], output_array[0].tolist()))
+        return output_dict
+
+    def get_output_array(self, input_grid:list) -> np.ndarray:
+        """
+        Gets the outputs of the surrogate model for multiple sets of inputs;
+        all the sets are evaluated in a single forward pass
+
+        Parameters:
+        * `input_grid`: The list of lists of raw input values
+
+        Returns the outputs as an array with one row per set of inputs;
+        the rows of invalid inputs are filled with NaN
+        """
+
+        # Initialise outputs and identify the valid inputs
+        input_array = np.array(input_grid, dtype=float)
+        output_array = np.full((len(input_array), len(self.output_map["param_name"])), np.nan)
+        valid_rows = np.all(input_array > 0, axis=1)
+        if not np.any(valid_rows):
+            return output_array
+
         # Process inputs
-        processed_input_list = []
-        for i in range(len(input_list)):
-            try:
-                input_value = math.log(input_list[i]) / math.log(self.input_map["base"][i])
-                input_value = linear(input_value, self.input_map, linear_map, i)
-            except ValueError:
-                return None
-            processed_input_list.append(input_value)
-        
+        input_array = input_array[valid_rows]
+        for i in range(input_array.shape[1]):
+            input_array[:,i] = np.log(input_array[:,i]) / math.log(self.input_map["base"][i])
+            input_array[:,i] = linear(input_array[:,i], self.input_map, linear_map, i)
+
         # Get raw outputs and process
-        input_tensor = torch.tensor(processed_input_list)
-        with torch.no_grad():
-            output_list = self.model(input_tensor).tolist()
-        for i in range(len(output_list)):
-            try:
-                output_list[i] = linear(output_list[i], self.output_map, linear_unmap, i)
-                output_list[i] = math.pow(self.output_map["base"][i], output_list[i])
-            except ValueError:
-                return None
-        
-        # Return the dictionary of outputs
-        output_dict = dict(zip(self.output_map["param_name"], output_list))
-        return output_dict
+        input_tensor = torch.tensor(input_array, dtype=torch.float32)
+        with torch.inference_mode():
+            output_array[valid_rows] = self.model(input_tensor).numpy()
+        for i in range(output_array.shape[1]):
+            output_array[:,i] = linear(output_array[:,i], self.output_map, linear_unmap, i)
+            output_array[:,i] = np.power(self.output_map["base"][i], output_array[:,i])
+        return output_array
@@ -10,8 +10,9 @@ from asmbo.paths import OPT_PATH, MMS_PATH
 import sys; sys.path += [OPT_PATH]
 import numpy as np
 from opt_all.interface import Interface
-from matplotlib.pyplot import figure
-from asmbo.helper.general import transpose
+from matplotlib.pyplot import figure, close
+from asmbo.helper.io import load_cols
+from asmbo.helper.orientation import get_euler_fields, get_trajectories
 from asmbo.helper.plotter import define_legend, save_plot
 from asmbo.helper.pole_figure import get_lattice, IPF
 
@@ -63,34 +64,48 @@ def optimise(train_path:str, opt_path:str, exp_path:str, max_strain:float, grain
         itf.add_error("area", labels=["strain", "stress"], group="curve", max_value=max_strain)
     else:
         itf.add_error("area", labels=["strain", "stress"], group="curve", max_value=max_strain, weight=3.1415*len(grain_ids))
+        eval_x_list = list(np.linspace(0, max_strain, 6))[1:]
         for i in grain_ids:
             itf.add_error(
                 error_name  = "geodesic",
-                labels      = ["strain_intervals"] + [f"g{i}_{phi}" for phi in ["phi_1", "Phi", "phi_2"]],
-                eval_x_list = list(np.linspace(0, max_strain, 6))[1:],
+                labels      = ["strain_intervals"] + list(get_euler_fields((i,))),
+                eval_x_list = eval_x_list,
                 group       = f"g{i}",
             )
 
+    # Prepare the lattice and experimental trajectories for the IPF plots
+    lattice = get_lattice("fcc")
+    direction = [1,0,0]
+    exp_fields = list(get_euler_fields(tuple(grain_ids)))
+    exp_dict = load_cols(exp_path, ["strain_intervals"] + exp_fields, cache=True)
+    exp_trajectories = get_trajectories(exp_dict, grain_ids, "strain_intervals", max_strain)
+    last_plot = {"output_path": None, "sim_trajectories": None}
+
     def plot_ipf(exp_dict:dict, sim_dict:dict, output_path:str) -> None:
         """
         Plots an IPF plot
 
         Parameters:
-        * `exp_dict`:    Dictionary containing the experimental data
+        * `exp_dict`:    Dictionary containing the experimental data;
+                         unused, as the experimental trajectories are prepared once
         * `sim_dict`:    Dictionary containing the simulated data
         * `output_path`: Path to output the plot
         """
         
+        # Skip the plot if the simulated trajectories have not changed since the last plot
+        sim_trajectories = get_trajectories(sim_dict, grain_ids, "strain", max_strain)
+        last_trajectories = last_plot["sim_trajectories"]
+        if output_path == last_plot["output_path"] and last_trajectories is not None and \
+            last_trajectories.shape == sim_trajectories.shape and np.allclose(last_trajectories, sim_trajectories, rtol=0, atol=1e-3):
+            return
+        last_plot["output_path"] = output_path
+        last_plot["sim_trajectories"] = sim_trajectories
+
         # Initialise
-        figure()
-        ipf = IPF(get_lattice("fcc"))
-        direction = [1,0,0]
-        get_trajectories = lambda dict, strain_field : [
-            transpose([[g for g, s in zip(dict[f"g{grain_id}_{phi}"], dict[strain_field]) if s <= max_strain] for phi in ["phi_1", "Phi", "phi_2"]])
-        for grain_id in grain_ids]
+        fig = figure()
+        ipf = IPF(lattice)
 
         # Plot experimental reorientation trajectories
-        exp_trajectories = get_trajectories(exp_dict, "strain_intervals")
         ipf.plot_ipf_trajectory(exp_trajectories, direction, "plot", {"color": "silver", "linewidth": 2})
         ipf.plot_ipf_trajectory(exp_trajectories, direction, "arrow", {"color": "silver", "head_width": 0.01, "head_length": 0.015})
         ipf.plot_ipf_trajectory([[et[0]] for et in exp_trajectories], direction, "scatter", {"color": "silver", "s": 8**2})
@@ -98,7 +113,6 @@ def optimise(train_path:str, opt_path:str, exp_path:str, max_strain:float, grain
             ipf.plot_ipf_trajectory([[exp_trajectory[0]]], direction, "text", {"color": "black", "fontsize": 8, "s": grain_id})
 
         # Plot simulation reorientation trajectories
-        sim_trajectories = get_trajectories(sim_dict, "strain")
         ipf.plot_ipf_trajectory(sim_trajectories, direction, "plot", {"color": "green", "linewidth": 1, "zorder": 3})
         ipf.plot_ipf_trajectory(sim_trajectories, direction, "arrow", {"color": "green", "head_width": 0.0075, "head_length": 0.0075*1.5, "zorder": 3})
         ipf.plot_ipf_trajectory([[st[0]] for st in sim_trajectories], direction, "scatter", {"color": "green", "s": 6**2, "zorder": 3})
@@ -106,6 +120,7 @@ def optimise(train_path:str, opt_path:str, exp_path:str, max_strain:float, grain
         # Save plot
         define_legend(["silver", "green"], ["Experiment", "Simulation"], ["scatter", "line"])
         save_plot(f"{output_path}/plot_rt.png")
+        close(fig)
 
     # Record plots
     itf.record_plot("strain", "stress")
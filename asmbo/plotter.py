@@ -7,8 +7,8 @@
 
 # Libraries
 import matplotlib.pyplot as plt
-from asmbo.helper.io import csv_to_dict
-from asmbo.helper.general import transpose
+from asmbo.helper.io import load_cols
+from asmbo.helper.orientation import get_euler_fields, get_trajectories
 from asmbo.helper.pole_figure import get_lattice, IPF
 from asmbo.helper.plotter import define_legend, save_plot, Plotter
 
@@ -26,9 +26,10 @@ def plot_results(sim_path:str, exp_path:str, cal_grain_ids:list,
     * `stress_field`:  Name of the field for the stress data
     """
 
-    # Get all results
-    res_dict = csv_to_dict(f"{sim_path}/summary.csv")
-    exp_dict = csv_to_dict(exp_path)
+    # Get the required results
+    grain_fields = list(get_euler_fields(tuple(cal_grain_ids + val_grain_ids)))
+    res_dict = load_cols(f"{sim_path}/summary.csv", [strain_field, stress_field] + grain_fields)
+    exp_dict = load_cols(exp_path, ["strain", "stress"] + grain_fields, cache=True)
 
     # Plot reorientation trajectories
     plot_trajectories(exp_dict, res_dict, cal_grain_ids, "green", "Calibration", f"{sim_path}/plot_opt_cal_rt.png")
@@ -39,10 +40,12 @@ def plot_results(sim_path:str, exp_path:str, cal_grain_ids:list,
     res_dict["stress"] = res_dict[stress_field]
     plotter = Plotter("strain", "stress", "mm/mm", "MPa")
     plotter.prep_plot()
+    fig = plt.gcf()
     plotter.scat_plot(exp_dict, "silver", "Experiment")
     plotter.line_plot(res_dict, "green", "Calibration")
     plotter.set_legend()
     save_plot(f"{sim_path}/plot_opt_ss.png")
+    plt.close(fig)
 
 def plot_trajectories(exp_dict:dict, sim_dict:dict, grain_ids:list, sim_colour:str,
                       sim_label:str, path:str) -> None:
@@ -59,12 +62,12 @@ def plot_trajectories(exp_dict:dict, sim_dict:dict, grain_ids:list, sim_colour:s
     """
 
     # Initialise IPF
+    fig = plt.figure()
     ipf = IPF(get_lattice("fcc"))
     direction = [1,0,0]
-    get_trajectories = lambda dict : [transpose([dict[f"g{grain_id}_{phi}"] for phi in ["phi_1", "Phi", "phi_2"]]) for grain_id in grain_ids]
 
     # Plot experimental reorientation trajectories
-    exp_trajectories = get_trajectories(exp_dict)
+    exp_trajectories = get_trajectories(exp_dict, grain_ids)
     ipf.plot_ipf_trajectory(exp_trajectories, direction, "plot", {"color": "silver", "linewidth": 2})
     ipf.plot_ipf_trajectory(exp_trajectories, direction, "arrow", {"color": "silver", "head_width": 0.01, "head_length": 0.015})
     ipf.plot_ipf_trajectory([[et[0]] for et in exp_trajectories], direction, "scatter", {"color": "silver", "s": 8**2})
@@ -72,7 +75,7 @@ def plot_trajectories(exp_dict:dict, sim_dict:dict, grain_ids:list, sim_colour:s
         ipf.plot_ipf_trajectory([[exp_trajectory[0]]], direction, "text", {"color": "black", "fontsize": 8, "s": grain_id})
 
     # Plot calibration reorientation trajectories
-    sim_trajectories = get_trajectories(sim_dict)
+    sim_trajectories = get_trajectories(sim_dict, grain_ids)
     ipf.plot_ipf_trajectory(sim_trajectories, direction, "plot", {"color": sim_colour, "linewidth": 1, "zorder": 3})
     ipf.plot_ipf_trajectory(sim_trajectories, direction, "arrow", {"color": sim_colour, "head_width": 0.0075, "head_length": 0.0075*1.5, "zorder": 3})
     ipf.plot_ipf_trajectory([[st[0]] for st in sim_trajectories], direction, "scatter", {"color": sim_colour, "s": 6**2, "zorder": 3})
@@ -80,3 +83,4 @@ def plot_trajectories(exp_dict:dict, sim_dict:dict, grain_ids:list, sim_colour:s
     # Save IPF
     define_legend(["silver", sim_colour], ["Experiment", sim_label], ["scatter", "line"])
     save_plot(path)
+    plt.close(fig)
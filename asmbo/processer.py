@@ -9,7 +9,7 @@
 import math, numpy as np
 from asmbo.helper.interpolator import Interpolator
 from asmbo.helper.general import round_sf
-from asmbo.helper.io import csv_to_dict
+from asmbo.helper.io import csv_to_dict, read_params
 
 def process(sim_path:str, param_names:list, strain_field:str, stress_field:str,
             num_strains:int, max_strain:float) -> dict:
@@ -68,11 +68,9 @@ def get_param_dict(params_path:str, param_names:list) -> dict:
     
     Returns a dictionary of the parameter values
     """
-    with open(params_path, "r") as fh:
-        line_list = [line.replace("\n", "").replace(":", "") for line in fh.readlines()]
-        param_dict = {line.split(" ")[0]: float(line.split(" ")[1]) for line in line_list
-                      if line.split(" ")[0] in param_names}
-        return param_dict
+    param_dict = read_params(params_path)
+    param_dict = {key: value for key, value in param_dict.items() if key in param_names}
+    return param_dict
 
 def fix_angle(angle:float, l_bound:float=0.0, u_bound:float=2*math.pi) -> float:
     """
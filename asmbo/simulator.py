@@ -9,7 +9,7 @@
 from asmbo.paths import SIM_PATH
 import sys; sys.path += [SIM_PATH]
 from moose_sim.interface import Interface
-from asmbo.helper.io import csv_to_dict
+from asmbo.helper.io import read_last_row
 import math
 
 def simulate(sim_path:str, mesh_path:str, exp_path:str, param_names:list,
@@ -51,11 +51,11 @@ def simulate(sim_path:str, mesh_path:str, exp_path:str, param_names:list,
     )
     
     # Defines the simulation parameters
-    exp_dict = csv_to_dict(exp_path)
-    eng_strain = math.exp(exp_dict["strain_intervals"][-1])-1
+    end_strain, end_time = read_last_row(exp_path, ["strain_intervals", "time_intervals"], cache=True)
+    eng_strain = math.exp(end_strain)-1
     itf.define_simulation(
         simulation_path = sim_model,
-        end_time        = exp_dict["time_intervals"][-1],
+        end_time        = end_time,
         end_strain      = eng_strain*dimensions["x"]
     )
 
@@ -7,7 +7,10 @@
 
 # Libraries
 import sys; sys.path += [".."]
-import time, os
+import time, os, hashlib, json
+import numpy as np, multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from asmbo.assessor import assess
 from asmbo.processer import process
 from asmbo.trainer import train
@@ -15,7 +18,7 @@ from asmbo.optimiser import optimise
 from asmbo.simulator import simulate
 from asmbo.plotter import plot_results
 from asmbo.helper.general import safe_mkdir
-from asmbo.helper.io import csv_to_dict
+from asmbo.helper.io import csv_to_dict, load_cols, read_first_row, read_params
 from asmbo.helper.sampler import get_lhs
 from asmbo.model_info import get_model_info
 
@@ -23,6 +26,7 @@ from asmbo.model_info import get_model_info
 MODEL_NAME = str(sys.argv[1]) # VH, LH2, or LH6
 NUM_PARAMS = int(sys.argv[2]) # number of samples; if 0, tries to resume from results folder
 RESULTS_PATH = str(sys.argv[3]) if len(sys.argv) > 2 else "./results"
+MIN_ITERATIONS = int(sys.argv[4]) if len(sys.argv) > 4 else 0 # iterations to run before stopping early
 
 # Simulation constants
 MAX_SIM_TIME   = 20000
@@ -31,6 +35,9 @@ STRAIN_FIELD   = "average_strain"
 STRESS_FIELD   = "average_stress"
 NUM_STRAINS    = 32
 NUM_PROCESSORS = 190//5
+RETRAIN_EVERY  = 5
+PARAM_TOLERANCE = 1e-3
+NUM_CONVERGED   = 3
 
 # Grain IDs
 # CAL_GRAIN_IDS = [14, 72, 95, 101, 207, 240, 262, 287]
@@ -43,6 +50,7 @@ CAL_GRAIN_IDS = []
 # Model information
 PARAM_INFO, OPT_MODEL, MAT_MODEL = get_model_info(MODEL_NAME)
 PARAM_NAMES = [pi["name"] for pi in PARAM_INFO]
+PARAM_INFO_DICT = {pi["name"]: pi["bounds"] for pi in PARAM_INFO}
 OPT_PARAMS  = [f"Param ({pn})" for pn in PARAM_NAMES]
 SIM_MODEL   = "deer/1to1_ui_cp_x"
 
@@ -56,9 +64,8 @@ def main():
     """
     
     # Initialise
-    get_prefix = lambda : f"{RESULTS_PATH}/" + time.strftime("%y%m%d%H%M%S", time.localtime(time.time()))
     safe_mkdir(RESULTS_PATH)
-    exp_dict = csv_to_dict(EXP_PATH)
+    exp_dict = load_cols(EXP_PATH, ["strain_intervals"])
     max_strain = exp_dict["strain_intervals"][-1]
     offset = 0
 
@@ -73,26 +80,29 @@ def main():
         params_dict_list = []
 
         # Sample parameter space
-        param_info_dict = dict(zip([pi["name"] for pi in PARAM_INFO], [pi["bounds"] for pi in PARAM_INFO]))
-        param_dict_list = get_lhs(param_info_dict, NUM_PARAMS)
+        param_dict_list = get_lhs(PARAM_INFO_DICT, NUM_PARAMS)
 
-        # Run model with sampled parameters
+        # Run model with sampled parameters; each simulation is post-processed
+        # in the background while the next simulation runs
+        post_pool = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"))
+        post_futures = []
         for i, param_dict in enumerate(param_dict_list):
     
             # Initialise
             param_vals = [param_dict[pn] for pn in PARAM_NAMES]
-            sim_path = f"{get_prefix()}_i1_initial_{i+1}"
+            sim_path = f"{RESULTS_PATH}/{time.strftime('%y%m%d%H%M%S')}_i1_initial_{i+1}"
             safe_mkdir(sim_path)
             
-            # Simulate, plot, and process
+            # Simulate, then plot and process in the background
             simulate(sim_path, MESH_PATH, EXP_PATH, PARAM_NAMES, param_vals, NUM_PROCESSORS, MAX_SIM_TIME, MAT_MODEL, SIM_MODEL)
-            plot_results(sim_path, EXP_PATH, CAL_GRAIN_IDS, VAL_GRAIN_IDS, STRAIN_FIELD, STRESS_FIELD)
-            sim_dict = process(sim_path, PARAM_NAMES, STRAIN_FIELD, STRESS_FIELD, NUM_STRAINS, max_strain)
-            sim_dict_list.append(sim_dict)
+            post_futures.append(post_pool.submit(post_process, sim_path, max_strain))
 
-            # Add parameters
-            sim_params = read_params(f"{sim_path}/params.txt")
+        # Add results and parameters in the sampled order
+        for post_future in post_futures:
+            sim_dict, sim_params = post_future.result()
+            sim_dict_list.append(sim_dict)
             params_dict_list.append(sim_params)
+        post_pool.shutdown()
 
     # Otherwise, read simulations from results folder
     else:
@@ -116,81 +126,207 @@ def main():
         print(f"Resuming adaptive calibration workflow ({MODEL_NAME}, {num_init}+{num_sim})")
 
     # Add simulation results to training dictionary
-    for i, sim_dict in enumerate(sim_dict_list):
-        if i == 0:
-            train_dict = {}
-            for key in sim_dict.keys():
-                if key in PARAM_NAMES:
-                    train_dict[key] = [sim_dict[key]]*NUM_STRAINS
-                else:
-                    train_dict[key] = sim_dict[key]
-        else:
-            train_dict = update_train_dict(train_dict, sim_dict)
+    train_dict = {key: np.empty(2*NUM_STRAINS*len(sim_dict_list)) for key in sim_dict_list[0].keys()}
+    train_size = 0
+    for sim_dict in sim_dict_list:
+        train_size = update_train_dict(train_dict, train_size, sim_dict)
+
+    # Load previously simulated parameters, so that repeated simulations are copied
+    sim_cache_path = f"{RESULTS_PATH}/sim_cache.json"
+    sim_cache = {}
+    if os.path.exists(sim_cache_path):
+        with open(sim_cache_path, "r") as fh:
+            sim_cache = json.load(fh)
+
+    # Plots are made in separate processes while the workflow continues
+    plot_pool = ProcessPoolExecutor(max_workers=2, mp_context=mp.get_context("spawn"))
+    plot_futures = []
+    param_ranges = np.array([PARAM_INFO_DICT[pn][1]-PARAM_INFO_DICT[pn][0] for pn in PARAM_NAMES])
+    prev_params = None
+    num_converged = 0
 
     # Iterate
     for i in range(offset,NUM_ITERATIONS+offset):
 
         # Initialise
         progressor = Progresser(i+1)
+        prefix = f"{RESULTS_PATH}/{time.strftime('%y%m%d%H%M%S')}_i{i+1}"
         print("="*40)
 
-        # 1) Train a surrogate model
-        progressor.progress("Training")
-        train_path = f"{get_prefix()}_i{i+1}_surrogate"
-        safe_mkdir(train_path)
-        train(train_dict, train_path, PARAM_NAMES, CAL_GRAIN_IDS, STRAIN_FIELD, STRESS_FIELD, NUM_PROCESSORS)
+        # Report any plots that have failed since the last iteration
+        plot_futures = check_plots(plot_futures)
+
+        # 1) Train a surrogate model every few iterations, and on the first and last
+        retrained = (i-offset) % RETRAIN_EVERY == 0 or i == NUM_ITERATIONS+offset-1
+        if retrained:
+            progressor.progress("Training")
+            train_path = f"{prefix}_surrogate"
+            safe_mkdir(train_path)
+            train({key: array[:train_size] for key, array in train_dict.items()}, train_path, PARAM_NAMES, CAL_GRAIN_IDS, STRAIN_FIELD, STRESS_FIELD, NUM_PROCESSORS)
+        else:
+            progressor.progress("Reusing")
 
-        # 2) Assesses the surrogate model on previously optimised parameters
+        # 2) Assesses the surrogate model on previously optimised parameters;
+        # the errors are saved with each iteration's optimisation results
         progressor.progress("Assessing")
-        init_params = assess(params_dict_list, train_path, EXP_PATH, max_strain, CAL_GRAIN_IDS, PARAM_NAMES)
+        opt_path = f"{prefix}_optimise"
+        safe_mkdir(opt_path)
+        init_params = assess(params_dict_list, train_path, EXP_PATH, max_strain, CAL_GRAIN_IDS, PARAM_NAMES, opt_path)
 
         # 3) Optimise surrogate model
         progressor.progress("Optimising")
-        opt_path = f"{get_prefix()}_i{i+1}_optimise"
-        safe_mkdir(opt_path)
         optimise(train_path, opt_path, EXP_PATH, max_strain, CAL_GRAIN_IDS, PARAM_INFO, OPT_MODEL, init_params)
 
-        # 4) Run CPFEM with optimised parameters
+        # 4) Run CPFEM with optimised parameters, unless they have already been simulated;
+        # previously simulated results are already in the training dictionary, so steps 5-7 are skipped
         progressor.progress("Validating")
-        sim_path = f"{get_prefix()}_i{i+1}_simulate"
-        opt_dict = csv_to_dict(f"{opt_path}/params.csv")
-        opt_params = [opt_dict[op][0] for op in OPT_PARAMS]
-        safe_mkdir(sim_path)
-        simulate(sim_path, MESH_PATH, EXP_PATH, PARAM_NAMES, opt_params, NUM_PROCESSORS, MAX_SIM_TIME, MAT_MODEL, SIM_MODEL)
-
-        # 5) Plot CPFEM simulation results
-        progressor.progress("Plotting")
-        plot_results(sim_path, EXP_PATH, CAL_GRAIN_IDS, VAL_GRAIN_IDS, STRAIN_FIELD, STRESS_FIELD)
-
-        # 6) Process simulation results
-        progressor.progress("Processing")
-        sim_dict = process(sim_path, PARAM_NAMES, STRAIN_FIELD, STRESS_FIELD, NUM_STRAINS, max_strain)
-        sim_params = read_params(f"{sim_path}/params.txt")
-        
-        # 7) Add to training dictionary
-        progressor.progress("Adding")
-        train_dict = update_train_dict(train_dict, sim_dict)
-        params_dict_list.append(sim_params)
+        opt_params = read_first_row(f"{opt_path}/params.csv", OPT_PARAMS)
+        sim_key = get_sim_key(opt_params)
+        if sim_key in sim_cache and os.path.exists(f"{sim_cache[sim_key]}/params.txt"):
+            print(f"Reusing the simulation results in {sim_cache[sim_key]}")
+            sim_params = read_params(f"{sim_cache[sim_key]}/params.txt")
+        else:
+            sim_path = f"{prefix}_simulate"
+            safe_mkdir(sim_path)
+            simulate(sim_path, MESH_PATH, EXP_PATH, PARAM_NAMES, opt_params, NUM_PROCESSORS, MAX_SIM_TIME, MAT_MODEL, SIM_MODEL)
+            sim_cache[sim_key] = sim_path
+            with open(sim_cache_path, "w+") as fh:
+                json.dump(sim_cache, fh)
+
+            # 5) Plot CPFEM simulation results
+            progressor.progress("Plotting")
+            plot_args = (plot_results, sim_path, EXP_PATH, CAL_GRAIN_IDS, VAL_GRAIN_IDS, STRAIN_FIELD, STRESS_FIELD)
+            try:
+                plot_futures.append(plot_pool.submit(*plot_args))
+            except BrokenProcessPool:
+                print("Restarting the plotting processes, as one of them has died")
+                plot_pool.shutdown(wait=False)
+                plot_pool = ProcessPoolExecutor(max_workers=2, mp_context=mp.get_context("spawn"))
+                plot_futures.append(plot_pool.submit(*plot_args))
+
+            # 6) Process simulation results
+            progressor.progress("Processing")
+            sim_dict = process(sim_path, PARAM_NAMES, STRAIN_FIELD, STRESS_FIELD, NUM_STRAINS, max_strain)
+            sim_params = read_params(f"{sim_path}/params.txt")
+            
+            # 7) Add to training dictionary
+            progressor.progress("Adding")
+            train_size = update_train_dict(train_dict, train_size, sim_dict)
+            params_dict_list.append(sim_params)
+
+        # Stop early if the parameters have stopped changing between retrained surrogates;
+        # the changes are relative to the parameter bounds, so that all parameters count
+        if not retrained:
+            continue
+        curr_params = np.array([sim_params[pn] for pn in PARAM_NAMES])
+        if prev_params is not None:
+            param_delta = np.max(np.abs(prev_params-curr_params)/param_ranges)
+            num_converged = num_converged+1 if param_delta < PARAM_TOLERANCE else 0
+        prev_params = curr_params
+        if num_converged >= NUM_CONVERGED and i+1-offset >= MIN_ITERATIONS:
+            print(f"Stopping early; parameters converged after {i+1} iterations")
+            break
+
+    # Wait for the remaining plots
+    wait(plot_futures)
+    check_plots(plot_futures)
+    plot_pool.shutdown(wait=True)
+
+def check_plots(plot_futures:list) -> list:
+    """
+    Reports the errors of the plots that have finished;
+    failed plots do not stop the workflow
 
-def update_train_dict(train_dict:dict, sim_dict:dict) -> dict:
+    Parameters:
+    * `plot_futures`: List of futures for the submitted plots
+
+    Returns the list of futures for the unfinished plots
+    """
+    pending_futures = []
+    for plot_future in plot_futures:
+        if not plot_future.done():
+            pending_futures.append(plot_future)
+        elif plot_future.exception() != None:
+            print(f"Plotting failed: {plot_future.exception()!r}")
+    return pending_futures
+
+def get_sim_key(param_vals:list) -> str:
     """
-    Updates the training dictionary
+    Gets the key identifying a simulation in the simulation cache;
+    covers the models and mesh as well as the rounded parameters
+
+    Parameters:
+    * `param_vals`: List of parameter values
+
+    Returns the key
+    """
+    model_str = "|".join([MODEL_NAME, MAT_MODEL, SIM_MODEL, MESH_PATH])
+    key_bytes = model_str.encode() + np.round(param_vals, 6).tobytes()
+    return hashlib.blake2b(key_bytes).hexdigest()[:16]
+
+def post_process(sim_path:str, max_strain:float) -> tuple:
+    """
+    Plots and processes the results of a simulation
+
+    Parameters:
+    * `sim_path`:   Path that stores the simulation results
+    * `max_strain`: Maximum strain to consider
+
+    Returns the processed results and the parameters of the simulation
+    """
+    plot_results(sim_path, EXP_PATH, CAL_GRAIN_IDS, VAL_GRAIN_IDS, STRAIN_FIELD, STRESS_FIELD)
+    sim_dict = process(sim_path, PARAM_NAMES, STRAIN_FIELD, STRESS_FIELD, NUM_STRAINS, max_strain)
+    sim_params = read_params(f"{sim_path}/params.txt")
+    return sim_dict, sim_params
+
+def update_train_dict(train_dict:dict, train_size:int, sim_dict:dict) -> int:
+    """
+    Updates the training dictionary in place; each field is stored in an
+    array with spare capacity, and keys missing from the added dictionary
+    are removed
 
     Parameters:
     * `train_dict`: The current training dictionary
+    * `train_size`: The number of rows used in the training dictionary
     * `sim_dict`:   The dictionary to add
 
-    Returns the combined dictionary
+    Returns the number of rows used after the update
     """
-    combined_dict = {}
-    for key in train_dict.keys():
+
+    # Check that the added fields have the same number of rows
+    row_dict = {key: np.atleast_1d(sim_dict[key]) for key in train_dict.keys()
+                if key in sim_dict.keys() and not key in PARAM_NAMES}
+    num_rows_set = {len(values) for values in row_dict.values()}
+    if len(num_rows_set) != 1:
+        raise ValueError(f"The added dictionary has fields with inconsistent numbers of rows {sorted(num_rows_set)}!")
+    num_rows = num_rows_set.pop()
+
+    # Add the fields, broadcasting the parameters across the rows
+    for key in list(train_dict.keys()):
         if not key in sim_dict.keys():
+            train_dict.pop(key)
             continue
-        if key in PARAM_NAMES:
-            combined_dict[key] = train_dict[key] + [sim_dict[key]]*NUM_STRAINS
-        else:
-            combined_dict[key] = train_dict[key] + sim_dict[key]
-    return combined_dict
+        values = np.full(num_rows, sim_dict[key]) if key in PARAM_NAMES else row_dict[key]
+        train_dict[key] = extend_array(train_dict[key], train_size, values)
+    return train_size + num_rows
+
+def extend_array(array:np.ndarray, size:int, values:list) -> np.ndarray:
+    """
+    Writes values after the used part of an array, doubling
+    the capacity of the array if it is not large enough
+
+    Parameters:
+    * `array`:  The array to extend
+    * `size`:   The number of values used in the array
+    * `values`: The values to add
+
+    Returns the extended array
+    """
+    new_size = size + len(values)
+    if new_size > len(array):
+        array = np.resize(array, max(2*len(array), new_size))
+    array[size:new_size] = values
+    return array
 
 # Progress updater class
 class Progresser:
@@ -199,29 +335,11 @@ class Progresser:
         self.step = 1
     def progress(self, verb:str):
         message = f"===== {self.iteration}.{self.step}: {verb} ====="
-        print("")
-        print("="*len(message))
-        print(message)
-        print("="*len(message))
-        print("")
+        border = "="*len(message)
+        sys.stdout.write(f"\n{border}\n{message}\n{border}\n\n")
+        sys.stdout.flush()
         self.step += 1
 
-def read_params(params_path:str) -> dict:
-    """
-    Reads parameters from a file
-
-    Parameters:
-    * `params_path`: The path to the parameters
-
-    Returns a dictionary containing the parameter information
-    """
-    data_dict = {}
-    with open(params_path, 'r') as file:
-        for line in file:
-            key, value = line.strip().split(": ")
-            data_dict[key] = float(value)
-    return data_dict
-
 # Main function caller
 if __name__ == "__main__":
     main()